@@ -1,55 +1,170 @@
 import os
 import time
-import json
+import sqlite3
+import asyncio
 import logging
-from typing import List
-import requests
+from contextlib import asynccontextmanager, closing
+from typing import Dict, Iterable, List, Optional, Set
+import aiohttp
+import ijson
+import orjson
 
 try:
-    import openai
+    from openai import AsyncOpenAI
 except ImportError:
-    openai = None
+    AsyncOpenAI = None
 
 
 logging.basicConfig(level=logging.INFO)
 
 DISCORD_WEBHOOK_URL = os.getenv('DISCORD_WEBHOOK_URL')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+OPENAI_CLIENT = AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY and AsyncOpenAI else None
 
+# JSON cache used before the SQLite store; migrated into POSTED_DEALS_DB once
 POSTED_DEALS_FILE = os.getenv('POSTED_DEALS_FILE', 'posted_deals.json')
+# Default to the JSON path with a .db extension, unless that is the JSON path itself
+_POSTED_DEALS_STEM = os.path.splitext(POSTED_DEALS_FILE)[0]
+POSTED_DEALS_DB = os.getenv(
+    'POSTED_DEALS_DB', _POSTED_DEALS_STEM + ('.sqlite' if POSTED_DEALS_FILE.endswith('.db') else '.db'))
 RESET_CACHE_ON_STARTUP = os.getenv('RESET_CACHE_ON_STARTUP', 'false').lower() in ('1', 'true', 'yes')
 CACHE_RESET_HOURS = float(os.getenv('CACHE_RESET_HOURS', '0'))
+STATE_FILE = os.getenv('STATE_FILE', 'state.json')
+STEAM_DETAILS_CACHE_FILE = os.getenv('STEAM_DETAILS_CACHE_FILE', 'steam_details_cache.db')
+STEAM_DETAILS_CACHE_DAYS = float(os.getenv('STEAM_DETAILS_CACHE_DAYS', '7'))
+# IDs per "IN (...)" lookup, well below SQLite's bound-parameter limit
+SQLITE_IN_CHUNK_SIZE = 500
 
-def load_cache() -> dict:
-    if not os.path.exists(POSTED_DEALS_FILE):
-        return {'Steam': set(), 'Epic': set()}
+
+def deal_key(deal: dict) -> str:
+    return f"{deal['store']}:{deal['id']}"
+
+
+def connect_cache() -> sqlite3.Connection:
+    conn = sqlite3.connect(POSTED_DEALS_DB)
+    conn.execute('CREATE TABLE IF NOT EXISTS posted '
+                 '(store TEXT, id TEXT, ts INTEGER, PRIMARY KEY (store, id))')
+    return conn
+
+
+def load_legacy_cache() -> Set[str]:
+    """Read deal keys from the JSON file used before the SQLite cache."""
+    with open(POSTED_DEALS_FILE, 'rb') as f:
+        data = orjson.loads(f.read())
+    if isinstance(data, dict):
+        # Older cache files stored one ID list per store
+        return {f'{store}:{x}' for store, ids in data.items() for x in ids}
+    return set(data)
+
+
+def load_cache() -> Set[str]:
     try:
-        with open(POSTED_DEALS_FILE, 'r') as f:
-            data = json.load(f)
-        return {
-            'Steam': set(str(x) for x in data.get('Steam', [])),
-            'Epic': set(str(x) for x in data.get('Epic', []))
-        }
+        with closing(connect_cache()) as conn:
+            rows = conn.execute('SELECT store, id FROM posted').fetchall()
+        cache = {f'{store}:{deal_id}' for store, deal_id in rows}
+        if cache or POSTED_DEALS_FILE == POSTED_DEALS_DB or not os.path.exists(POSTED_DEALS_FILE):
+            return cache
+        cache = load_legacy_cache()
     except Exception as e:
         logging.error('Failed to load deal cache: %s', e)
-        return {'Steam': set(), 'Epic': set()}
+        return set()
+    if not save_cache(cache):
+        # Keep the JSON file so the next run can retry the import
+        return cache
+    logging.info('Migrated %s posted deals from %s', len(cache), POSTED_DEALS_FILE)
+    try:
+        os.replace(POSTED_DEALS_FILE, POSTED_DEALS_FILE + '.migrated')
+    except OSError as e:
+        # The import is committed; a leftover JSON file is ignored once the database has rows
+        logging.warning('Could not rename %s after migrating it: %s', POSTED_DEALS_FILE, e)
+    return cache
 
 
-def save_cache(cache: dict):
+def save_cache(keys: Iterable[str]) -> bool:
+    """Record newly posted deal keys; return whether they were committed."""
+    now = int(time.time())
     try:
-        with open(POSTED_DEALS_FILE, 'w') as f:
-            json.dump({'Steam': list(cache['Steam']), 'Epic': list(cache['Epic'])}, f)
+        with closing(connect_cache()) as conn, conn:
+            conn.executemany('INSERT OR IGNORE INTO posted VALUES (?, ?, ?)',
+                             [(*key.split(':', 1), now) for key in keys])
+        return True
     except Exception as e:
         logging.error('Failed to save deal cache: %s', e)
+        return False
 
 
-def reset_cache() -> dict:
-    cache = {'Steam': set(), 'Epic': set()}
-    save_cache(cache)
-    logging.info('Deal cache has been reset')
-    return cache
+def reset_cache() -> Set[str]:
+    try:
+        with closing(connect_cache()) as conn, conn:
+            conn.execute('DELETE FROM posted')
+        # Force full catalog downloads so current deals get posted again
+        STATE.pop('validators', None)
+        logging.info('Deal cache has been reset')
+    except Exception as e:
+        logging.error('Failed to reset deal cache: %s', e)
+    return set()
 
 
+def load_state() -> dict:
+    """Return bookkeeping that must survive between scheduled runs."""
+    if not os.path.exists(STATE_FILE):
+        return {}
+    try:
+        with open(STATE_FILE, 'rb') as f:
+            return orjson.loads(f.read())
+    except Exception as e:
+        logging.error('Failed to load state: %s', e)
+        return {}
+
+
+def save_state(state: dict):
+    try:
+        with open(STATE_FILE, 'wb') as f:
+            f.write(orjson.dumps(state))
+    except Exception as e:
+        logging.error('Failed to save state: %s', e)
+
+
+def connect_details_cache() -> sqlite3.Connection:
+    conn = sqlite3.connect(STEAM_DETAILS_CACHE_FILE)
+    conn.execute('CREATE TABLE IF NOT EXISTS steam_details '
+                 '(app_id INTEGER PRIMARY KEY, ts REAL, description TEXT, rating TEXT)')
+    return conn
+
+
+def load_details_cache(app_ids: List[int]) -> Dict[int, dict]:
+    """Return cached Steam details for the given apps, dropping expired entries."""
+    cutoff = time.time() - STEAM_DETAILS_CACHE_DAYS * 86400
+    details = {}
+    try:
+        with closing(connect_details_cache()) as conn, conn:
+            conn.execute('DELETE FROM steam_details WHERE ts < ?', (cutoff,))
+            for i in range(0, len(app_ids), SQLITE_IN_CHUNK_SIZE):
+                chunk = app_ids[i:i + SQLITE_IN_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute('SELECT app_id, description, rating FROM steam_details '
+                                    f'WHERE app_id IN ({placeholders})', chunk)
+                for app_id, description, rating in rows:
+                    details[app_id] = {'description': description, 'rating': rating}
+    except Exception as e:
+        logging.error('Failed to load Steam details cache: %s', e)
+        return {}
+    return details
+
+
+def save_details_cache(details: Dict[int, dict]):
+    now = time.time()
+    try:
+        with closing(connect_details_cache()) as conn, conn:
+            conn.executemany('INSERT OR REPLACE INTO steam_details VALUES (?, ?, ?, ?)',
+                             [(app_id, now, d['description'], d['rating']) for app_id, d in details.items()])
+    except Exception as e:
+        logging.error('Failed to save Steam details cache: %s', e)
+
+
+STATE = load_state()
+# Catalog validators from this run, committed to STATE only after a clean run
+PENDING_VALIDATORS: Dict[str, dict] = {}
 POSTED_DEALS = load_cache()
 if RESET_CACHE_ON_STARTUP:
     POSTED_DEALS = reset_cache()
@@ -60,13 +175,46 @@ STEAM_APPREVIEWS_URL = 'https://store.steampowered.com/appreviews/{app_id}?json=
 
 EPIC_DEALS_URL = 'https://store-site-backend-static.ak.epicgames.com/freeGamesPromotions?locale=en-US&country=US&allowCountries=US'
 
-
-def summarize_text(text: str) -> str:
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=30)
+HTTP_POOL_SIZE = 32
+# Transient Steam/Epic failures are retried with exponential backoff
+HTTP_MAX_ATTEMPTS = 3
+HTTP_BACKOFF_SECONDS = 0.5
+HTTP_RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Upper bound on in-flight Steam detail lookups to stay clear of rate limits
+STEAM_CONCURRENCY = 10
+# App IDs per appdetails query; if Steam rejects batching, the run falls back to one query per app
+STEAM_APPDETAILS_BATCH_SIZE = 20
+# Webhooks are limited to roughly 30 requests per minute
+DISCORD_CONCURRENCY = 5
+DISCORD_MAX_ATTEMPTS = 3
+# Descriptions shorter than this are posted as-is instead of asking OpenAI
+SUMMARY_MIN_LENGTH = 200
+# In-flight completions; excess requests would be rate-limited into the fallback
+OPENAI_CONCURRENCY = 5
+
+STEAM_MESSAGE_TEMPLATE = ("**{name}** on Steam - {discount_percent}% off\n"
+                          "Price: {final_price} {currency}\n"
+                          "Rating: {rating}\n"
+                          "Summary: {summary}")
+EPIC_MESSAGE_TEMPLATE = ("**{name}** on Epic Games - {discount_percent}% off\n"
+                         "Price: {final_price} {currency}\n"
+                         "Rating: N/A\n"
+                         "Summary: {summary}")
+
+
+def is_short_text(text: str) -> bool:
+    """Whether the text is already about as short as a two-sentence summary."""
+    return len(text) < SUMMARY_MIN_LENGTH or text.count('.') <= 2
+
+
+async def summarize_text(text: str) -> str:
     """Generate a short summary for the given text."""
-    if OPENAI_API_KEY and openai:
-        openai.api_key = OPENAI_API_KEY
+    if is_short_text(text):
+        return ' '.join(text.split())
+    if OPENAI_CLIENT:
         try:
-            resp = openai.ChatCompletion.create(
+            resp = await OPENAI_CLIENT.chat.completions.create(
                 model='gpt-3.5-turbo',
                 messages=[
                     {
@@ -81,156 +229,342 @@ def summarize_text(text: str) -> str:
                 temperature=0.7,
                 max_tokens=100,
             )
-            return resp['choices'][0]['message']['content'].strip()
+            return resp.choices[0].message.content.strip()
         except Exception as e:
             logging.error('OpenAI API failed: %s', e)
-    # Fallback: simple first sentence summary
-    sentences = text.replace('\n', ' ').split('.')
-    return '. '.join(sentences[:2]).strip() + '.'
+    # Fallback: first two sentences
+    sentences = [' '.join(s.split()) for s in text.split('.', 2)[:2]]
+    return '. '.join(s for s in sentences if s) + '.'
 
 
-def post_to_discord(message: str):
-    if not DISCORD_WEBHOOK_URL:
-        logging.warning('DISCORD_WEBHOOK_URL not set; skipping Discord notification.')
-        return
-    try:
-        resp = requests.post(DISCORD_WEBHOOK_URL, json={'content': message})
-        if resp.status_code >= 300:
-            logging.error('Failed to post to Discord: %s %s', resp.status_code, resp.text)
-    except Exception as e:
-        logging.error('Error posting to Discord: %s', e)
+async def summarize_many(texts: List[str], semaphore: asyncio.Semaphore) -> List[str]:
+    """Summarize several texts concurrently, preserving order."""
+    async def limited_summary(text: str) -> str:
+        async with semaphore:
+            return await summarize_text(text)
+
+    # Identical descriptions (e.g. editions of one game) are summarized once
+    unique_texts = list(dict.fromkeys(texts))
+    summaries = await asyncio.gather(*(limited_summary(text) for text in unique_texts))
+    by_text = dict(zip(unique_texts, summaries))
+    return [by_text[text] for text in texts]
 
 
-def fetch_steam_deals() -> List[dict]:
+async def post_to_discord(session: aiohttp.ClientSession, message: str) -> bool:
+    """Post a message to the webhook; return whether Discord accepted it."""
+    if not DISCORD_WEBHOOK_URL:
+        logging.warning('DISCORD_WEBHOOK_URL not set; skipping Discord notification.')
+        return False
+    for attempt in range(1, DISCORD_MAX_ATTEMPTS + 1):
+        try:
+            async with session.post(DISCORD_WEBHOOK_URL, json={'content': message}, timeout=HTTP_TIMEOUT) as resp:
+                if resp.status == 429:
+                    if attempt == DISCORD_MAX_ATTEMPTS:
+                        break
+                    retry_after = float(resp.headers.get('Retry-After', '1'))
+                    logging.warning('Discord rate limit hit; retrying in %s seconds', retry_after)
+                    await asyncio.sleep(retry_after)
+                    continue
+                if resp.status >= 300:
+                    logging.error('Failed to post to Discord: %s %s', resp.status, await resp.text())
+                    return False
+                if resp.headers.get('X-RateLimit-Remaining') == '0':
+                    # Wait out the bucket instead of provoking a 429 on the next post
+                    await asyncio.sleep(float(resp.headers.get('X-RateLimit-Reset-After', '0')))
+                return True
+        except Exception as e:
+            logging.error('Error posting to Discord: %s', e)
+            return False
+    logging.error('Giving up posting to Discord after %s attempts', DISCORD_MAX_ATTEMPTS)
+    return False
+
+
+async def post_many_to_discord(session: aiohttp.ClientSession, messages: Dict[str, str]) -> List[str]:
+    """Post all messages; return the keys of the ones Discord accepted."""
+    semaphore = asyncio.Semaphore(DISCORD_CONCURRENCY)
+
+    async def limited_post(message: str) -> bool:
+        async with semaphore:
+            return await post_to_discord(session, message)
+
+    results = await asyncio.gather(*(limited_post(message) for message in messages.values()))
+    return [key for key, accepted in zip(messages, results) if accepted]
+
+
+@asynccontextmanager
+async def http_get(session: aiohttp.ClientSession, url: str, **kwargs):
+    """GET url, retrying 429 and 5xx responses before handing the last response to the caller."""
+    for attempt in range(1, HTTP_MAX_ATTEMPTS + 1):
+        async with session.get(url, timeout=HTTP_TIMEOUT, **kwargs) as resp:
+            if resp.status not in HTTP_RETRY_STATUSES or attempt == HTTP_MAX_ATTEMPTS:
+                yield resp
+                return
+            delay = HTTP_BACKOFF_SECONDS * 2 ** (attempt - 1)
+            try:
+                delay = max(delay, float(resp.headers.get('Retry-After', 0)))
+            except ValueError:
+                pass
+        logging.warning('%s returned %s; retrying in %s seconds', url, resp.status, delay)
+        await asyncio.sleep(delay)
+
+
+def conditional_headers(url: str) -> dict:
+    """Return If-None-Match/If-Modified-Since headers from the last fetch of url."""
+    validators = STATE.get('validators', {}).get(url, {})
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+
+def remember_validators(url: str, resp: aiohttp.ClientResponse):
+    """Stage validators for url; they are only kept once the run has fully succeeded."""
+    PENDING_VALIDATORS[url] = {
+        'etag': resp.headers.get('ETag'),
+        'last_modified': resp.headers.get('Last-Modified'),
+    }
+
+
+def commit_validators():
+    STATE.setdefault('validators', {}).update(PENDING_VALIDATORS)
+    PENDING_VALIDATORS.clear()
+
+
+async def fetch_steam_deals(session: aiohttp.ClientSession) -> List[dict]:
     logging.info('Fetching Steam specials')
     deals = []
     try:
-        resp = requests.get(STEAM_SPECIALS_URL, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-        items = data.get('specials', {}).get('items', [])
-        for item in items:
-            if item.get('discount_percent', 0) >= 50 or item.get('final_price', 1) == 0:
+        async with http_get(session, STEAM_SPECIALS_URL, headers=conditional_headers(STEAM_SPECIALS_URL)) as resp:
+            if resp.status == 304:
+                logging.info('Steam specials unchanged since last run')
+                return deals
+            resp.raise_for_status()
+            # Stream only the specials list instead of materializing every category
+            async for item in ijson.items_async(resp.content, 'specials.items.item', use_float=True):
+                discount_percent = item.get('discount_percent', 0)
+                final_price = item.get('final_price')
+                if discount_percent < 50 and final_price != 0:
+                    continue
                 deals.append({
                     'store': 'Steam',
                     'id': item.get('id'),
                     'name': item.get('name'),
-                    'discount_percent': item.get('discount_percent'),
-                    'final_price': item.get('final_price', 0) / 100.0,
+                    'discount_percent': discount_percent,
+                    'final_price': (final_price or 0) / 100.0,
                     'currency': item.get('currency', 'USD'),
                 })
-    except requests.HTTPError as e:
+            remember_validators(STEAM_SPECIALS_URL, resp)
+    except aiohttp.ClientResponseError as e:
         logging.error('HTTP error fetching Steam deals: %s', e)
     except Exception as e:
         logging.error('Failed to fetch Steam deals: %s', e)
     return deals
 
 
-def fetch_steam_details(app_id: int) -> dict:
+async def fetch_steam_details_chunk(session: aiohttp.ClientSession,
+                                    app_ids: List[int]) -> Optional[Dict[int, dict]]:
+    """Return details for the apps appdetails resolved, or None if Steam rejected a multi-app query."""
+    batched = len(app_ids) > 1
     try:
-        params = {'appids': app_id, 'l': 'en'}
-        resp = requests.get(STEAM_APPDETAILS_URL, params=params, timeout=30)
-        resp.raise_for_status()
-        detail = resp.json()
-        data = detail[str(app_id)]['data']
-        description = data.get('short_description') or ''
-    except requests.HTTPError as e:
-        logging.error('HTTP error fetching details for %s: %s', app_id, e)
-        description = ''
+        params = {'appids': ','.join(map(str, app_ids)), 'filters': 'basic', 'l': 'en'}
+        async with http_get(session, STEAM_APPDETAILS_URL, params=params) as resp:
+            if batched and resp.status == 400:
+                return None
+            resp.raise_for_status()
+            payload = orjson.loads(await resp.read())
+    except aiohttp.ClientResponseError as e:
+        logging.error('HTTP error fetching details for %s: %s', app_ids, e)
+        return {}
     except Exception as e:
-        logging.error('Failed to fetch details for %s: %s', app_id, e)
-        description = ''
+        logging.error('Failed to fetch details for %s: %s', app_ids, e)
+        return {}
+    if not isinstance(payload, dict):
+        if batched:
+            return None
+        logging.error('No details returned for %s', app_ids[0])
+        return {}
+    details = {}
+    for app_id in app_ids:
+        entry = payload.get(str(app_id)) or {}
+        if not entry.get('success'):
+            logging.error('No details returned for %s', app_id)
+            continue
+        data = entry.get('data') or {}
+        details[app_id] = {'description': data.get('short_description') or ''}
+    return details
+
+
+async def fetch_steam_details_batch(session: aiohttp.ClientSession, app_ids: List[int],
+                                    semaphore: asyncio.Semaphore) -> Dict[int, dict]:
+    async def limited_chunk(chunk: List[int]) -> Optional[Dict[int, dict]]:
+        async with semaphore:
+            return await fetch_steam_details_chunk(session, chunk)
+
+    chunks = [app_ids[i:i + STEAM_APPDETAILS_BATCH_SIZE]
+              for i in range(0, len(app_ids), STEAM_APPDETAILS_BATCH_SIZE)]
+    details = {}
+    # Probe with the first chunk; Steam may refuse multi-app queries, so stop batching for this run if it does
+    first = await limited_chunk(chunks[0]) if chunks else {}
+    if first is None:
+        logging.warning('Steam rejected batched appdetails; fetching %s apps individually', len(app_ids))
+        chunks = [[app_id] for app_id in app_ids]
+    else:
+        details.update(first)
+        chunks = chunks[1:]
+    rejected = []
+    for chunk, chunk_details in zip(chunks, await asyncio.gather(*(limited_chunk(chunk) for chunk in chunks))):
+        if chunk_details is None:
+            rejected.extend(chunk)
+        else:
+            details.update(chunk_details)
+    if rejected:
+        logging.warning('Steam rejected batched appdetails; fetching %s apps individually', len(rejected))
+        for chunk_details in await asyncio.gather(*(limited_chunk([app_id]) for app_id in rejected)):
+            details.update(chunk_details)
+    for app_id in app_ids:
+        details.setdefault(app_id, {'description': ''})
+    return details
+
+
+async def fetch_steam_rating(session: aiohttp.ClientSession, app_id: int) -> str:
     try:
-        resp = requests.get(STEAM_APPREVIEWS_URL.format(app_id=app_id), timeout=30)
-        resp.raise_for_status()
-        reviews = resp.json()
-        rating = reviews.get('query_summary', {}).get('review_score_desc', 'Unknown')
-    except requests.HTTPError as e:
+        async with http_get(session, STEAM_APPREVIEWS_URL.format(app_id=app_id)) as resp:
+            resp.raise_for_status()
+            reviews = orjson.loads(await resp.read())
+        return reviews.get('query_summary', {}).get('review_score_desc', 'Unknown')
+    except aiohttp.ClientResponseError as e:
         logging.error('HTTP error fetching reviews for %s: %s', app_id, e)
-        rating = 'Unknown'
     except Exception as e:
         logging.error('Failed to fetch reviews for %s: %s', app_id, e)
-        rating = 'Unknown'
-    return {'description': description, 'rating': rating}
-
-
-def fetch_epic_deals() -> List[dict]:
+    return 'Unknown'
+
+
+async def fetch_steam_details(session: aiohttp.ClientSession, app_ids: List[int]) -> Dict[int, dict]:
+    # SQLite access runs in a worker thread so Epic processing is not stalled
+    details = await asyncio.to_thread(load_details_cache, app_ids)
+    missing = [app_id for app_id in app_ids if app_id not in details]
+    if not missing:
+        return details
+    semaphore = asyncio.Semaphore(STEAM_CONCURRENCY)
+
+    async def limited_rating(app_id: int) -> str:
+        async with semaphore:
+            return await fetch_steam_rating(session, app_id)
+
+    async def fetch_ratings() -> list:
+        return await asyncio.gather(*(limited_rating(app_id) for app_id in missing), return_exceptions=True)
+
+    # Descriptions and reviews are independent, so both sets of requests overlap
+    fetched, ratings = await asyncio.gather(fetch_steam_details_batch(session, missing, semaphore), fetch_ratings())
+    for app_id, rating in zip(missing, ratings):
+        if isinstance(rating, Exception):
+            logging.error('Failed to fetch reviews for %s: %s', app_id, rating)
+            rating = 'Unknown'
+        fetched[app_id]['rating'] = rating
+    # Only cache complete lookups so failed requests are retried next run
+    await asyncio.to_thread(save_details_cache, {app_id: d for app_id, d in fetched.items()
+                                                 if d['description'] and d['rating'] != 'Unknown'})
+    details.update(fetched)
+    return details
+
+
+async def fetch_epic_deals(session: aiohttp.ClientSession) -> List[dict]:
     logging.info('Fetching Epic Games deals')
     deals = []
     try:
-        resp = requests.get(EPIC_DEALS_URL, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
+        async with http_get(session, EPIC_DEALS_URL, headers=conditional_headers(EPIC_DEALS_URL)) as resp:
+            if resp.status == 304:
+                logging.info('Epic Games deals unchanged since last run')
+                return deals
+            resp.raise_for_status()
+            data = orjson.loads(await resp.read())
         elements = data.get('data', {}).get('Catalog', {}).get('searchStore', {}).get('elements', [])
         for el in elements:
             price_info = el.get('price', {}).get('totalPrice', {})
             original = price_info.get('originalPrice', 0)
             discount = price_info.get('discountPrice', original)
-            if original and (discount / original) <= 0.5 or discount == 0:
-                deals.append({
-                    'store': 'Epic',
-                    'id': el.get('id'),
-                    'name': el.get('title'),
-                    'discount_percent': int(100 - (discount * 100 // original)) if original else 100,
-                    'final_price': discount / 100.0,
-                    'currency': price_info.get('currencyCode', 'USD'),
-                    'description': el.get('description', '')
-                })
-    except requests.HTTPError as e:
+            if original:
+                # Integer test for 'at least half off', avoiding a float divide per element
+                if discount * 2 > original:
+                    continue
+                discount_percent = 100 - discount * 100 // original
+            elif discount == 0:
+                discount_percent = 100
+            else:
+                continue
+            deals.append({
+                'store': 'Epic',
+                'id': el.get('id'),
+                'name': el.get('title'),
+                'discount_percent': discount_percent,
+                'final_price': discount / 100.0,
+                'currency': price_info.get('currencyCode', 'USD'),
+                'description': el.get('description', '')
+            })
+        remember_validators(EPIC_DEALS_URL, resp)
+    except aiohttp.ClientResponseError as e:
         logging.error('HTTP error fetching Epic deals: %s', e)
     except Exception as e:
         logging.error('Failed to fetch Epic deals: %s', e)
     return deals
 
 
-def process_steam_deals():
-    for deal in fetch_steam_deals():
-        deal_id = str(deal['id'])
-        if deal_id in POSTED_DEALS['Steam']:
-            continue
-        details = fetch_steam_details(deal['id'])
-        summary = summarize_text(details['description'])
-        message = (f"**{deal['name']}** on Steam - {deal['discount_percent']}% off\n"
-                   f"Price: {deal['final_price']} {deal['currency']}\n"
-                   f"Rating: {details['rating']}\n"
-                   f"Summary: {summary}")
-        post_to_discord(message)
-        POSTED_DEALS['Steam'].add(deal_id)
-
-
-def process_epic_deals():
-    for deal in fetch_epic_deals():
-        deal_id = str(deal['id'])
-        if deal_id in POSTED_DEALS['Epic']:
-            continue
-        summary = summarize_text(deal.get('description', ''))
-        message = (f"**{deal['name']}** on Epic Games - {deal['discount_percent']}% off\n"
-                   f"Price: {deal['final_price']} {deal['currency']}\n"
-                   f"Rating: N/A\n"
-                   f"Summary: {summary}")
-        post_to_discord(message)
-        POSTED_DEALS['Epic'].add(deal_id)
-
-
-def run_once():
-    process_steam_deals()
-    process_epic_deals()
-    save_cache(POSTED_DEALS)
-
-
-def main():
-    interval = int(os.getenv('CHECK_INTERVAL_HOURS', '8'))
-    logging.info('Starting deal bot - interval %s hours', interval)
-    last_reset = time.time()
-    while True:
-        run_once()
-        if CACHE_RESET_HOURS > 0 and time.time() - last_reset >= CACHE_RESET_HOURS * 3600:
-            global POSTED_DEALS
-            POSTED_DEALS = reset_cache()
-            last_reset = time.time()
-        logging.info('Sleeping for %s hours', interval)
-        time.sleep(interval * 3600)
+async def process_steam_deals(session: aiohttp.ClientSession,
+                              summary_semaphore: asyncio.Semaphore) -> Dict[str, str]:
+    """Return Discord messages for new Steam deals, keyed by deal cache key."""
+    deals = [deal for deal in await fetch_steam_deals(session)
+             if deal_key(deal) not in POSTED_DEALS]
+    details_by_id = await fetch_steam_details(session, [deal['id'] for deal in deals])
+    summaries = await summarize_many([details_by_id[deal['id']]['description'] for deal in deals],
+                                     summary_semaphore)
+    messages = {}
+    for deal, summary in zip(deals, summaries):
+        fields = {**deal, **details_by_id[deal['id']], 'summary': summary}
+        messages[deal_key(deal)] = STEAM_MESSAGE_TEMPLATE.format_map(fields)
+    return messages
+
+
+async def process_epic_deals(session: aiohttp.ClientSession,
+                             summary_semaphore: asyncio.Semaphore) -> Dict[str, str]:
+    """Return Discord messages for new Epic deals, keyed by deal cache key."""
+    deals = [deal for deal in await fetch_epic_deals(session)
+             if deal_key(deal) not in POSTED_DEALS]
+    summaries = await summarize_many([deal.get('description', '') for deal in deals], summary_semaphore)
+    messages = {}
+    for deal, summary in zip(deals, summaries):
+        messages[deal_key(deal)] = EPIC_MESSAGE_TEMPLATE.format_map({**deal, 'summary': summary})
+    return messages
+
+
+async def run_once(session: aiohttp.ClientSession):
+    # Both stores are processed together so their summaries overlap, sharing one OpenAI limit
+    summary_semaphore = asyncio.Semaphore(OPENAI_CONCURRENCY)
+    steam_messages, epic_messages = await asyncio.gather(
+        process_steam_deals(session, summary_semaphore), process_epic_deals(session, summary_semaphore))
+    messages = {**steam_messages, **epic_messages}
+    # Only accepted deals are recorded; the rest are offered again next run
+    posted = await post_many_to_discord(session, messages)
+    POSTED_DEALS.update(posted)
+    saved = await asyncio.to_thread(save_cache, posted)
+    # A 304 next run skips the catalog entirely, so only trust it after a clean run
+    if len(posted) == len(messages) and saved:
+        commit_validators()
+
+
+async def main():
+    global POSTED_DEALS
+    logging.info('Starting deal bot run')
+    last_reset = STATE.setdefault('last_reset', time.time())
+    if CACHE_RESET_HOURS > 0 and time.time() - last_reset >= CACHE_RESET_HOURS * 3600:
+        POSTED_DEALS = reset_cache()
+        STATE['last_reset'] = time.time()
+    connector = aiohttp.TCPConnector(limit=HTTP_POOL_SIZE)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await run_once(session)
+    save_state(STATE)
 
 
 if __name__ == '__main__':
-    main()
+    asyncio.run(main())